@@ -10,6 +10,6 @@ class baml_vet_client:
     async def extract_vet_tasks(self, input: VetInput) -> VetOutput:
         try:
             result = await self.baml.ExtractVetTasks(input=input)
-            return result
+            return VetOutput.model_validate(result.model_dump())
         except Exception as e:
             raise Exception(f"extract_vet_tasks task failed: {str(e)}")
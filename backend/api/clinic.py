@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
 from sqlalchemy.future import select
-from backend.models.database import async_session, Clinic
-from pydantic import BaseModel
-from backend.utils.resiliency import resilient, sanitize_input, SafeLogger
+from backend.models.database import get_db, Clinic
+from pydantic import BaseModel, ConfigDict
+from backend.utils.resiliency import resilient, sanitize_input, sanitize_fields, string_fields, get_safe_logger
+from backend.utils.cache import cached, invalidate
 from typing import Optional, List
 from datetime import datetime
 
 router = APIRouter()
-logger = SafeLogger(__name__)
+logger = get_safe_logger(__name__)
 
 
 # --------------------------
@@ -45,20 +47,23 @@ class ClinicOut(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
 
 
-async def get_db():
-    async with async_session() as session:
-        yield session
+class ClinicPage(BaseModel):
+    """Schema for a keyset-paginated page of Clinics."""
+    items: List[ClinicOut]
+    next_cursor: Optional[str] = None
+
+
+# String fields of ClinicCreate, resolved once at import
+_CLINIC_STR_FIELDS = string_fields(ClinicCreate)
 
 
 # --------------------------
 # Create Clinic
 # --------------------------
 @router.post("/", response_model=ClinicOut, status_code=201, tags=["Clinics"])
-@resilient()
 async def create_clinic(clinic: ClinicCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new clinic record.
@@ -67,26 +72,20 @@ async def create_clinic(clinic: ClinicCreate, db: AsyncSession = Depends(get_db)
     - **400**: Invalid request payload.
     - **500**: Internal server error.
     """
-    try:
-        db_clinic = Clinic(
-            **{k: sanitize_input(v) if isinstance(v, str) else v for k, v in clinic.dict().items()}
-        )
-        db.add(db_clinic)
-        await db.commit()
-        await db.refresh(db_clinic)
-        logger.info(f"Clinic created: {db_clinic.id}")
-        return db_clinic
-    except Exception as e:
-        logger.error(f"Error creating clinic: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create clinic: {str(e)}")
+    stmt = insert(Clinic).values(
+        **sanitize_fields(clinic.model_dump(), _CLINIC_STR_FIELDS)
+    ).returning(Clinic)
+    db_clinic = await db.scalar(stmt)
+    await db.commit()
+    await invalidate("clinics")
+    logger.info("Clinic created: %s", db_clinic.id)
+    return db_clinic
 
 
 # --------------------------
 # Get Clinic by ID
 # --------------------------
 @router.get("/{clinic_id}", response_model=ClinicOut, tags=["Clinics"])
-@resilient()
 async def get_clinic(clinic_id: str, db: AsyncSession = Depends(get_db)):
     """
     Retrieve a clinic by ID.
@@ -94,48 +93,45 @@ async def get_clinic(clinic_id: str, db: AsyncSession = Depends(get_db)):
     - **200**: Clinic details.
     - **404**: Clinic not found.
     """
-    try:
-        clinic_id = sanitize_input(clinic_id)
-        result = await db.execute(select(Clinic).where(Clinic.id == clinic_id))
-        clinic = result.scalars().first()
-        if not clinic:
-            logger.warning(f"Clinic not found: {clinic_id}")
-            raise HTTPException(status_code=404, detail="Clinic not found")
-        logger.info(f"Clinic retrieved: {clinic_id}")
-        return clinic
-    except Exception as e:
-        logger.error(f"Error retrieving clinic: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to retrieve clinic: {str(e)}")
+    clinic_id = sanitize_input(clinic_id)
+    clinic = await db.get(Clinic, clinic_id)
+    if not clinic:
+        logger.warning("Clinic not found: %s", clinic_id)
+        raise HTTPException(status_code=404, detail="Clinic not found")
+    logger.info("Clinic retrieved: %s", clinic_id)
+    return clinic
 
 
 # --------------------------
 # List Clinics
 # --------------------------
-@router.get("/", response_model=List[ClinicOut], tags=["Clinics"])
-@resilient(fallback_value=[])
-async def list_clinics(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=ClinicPage, tags=["Clinics"])
+@resilient(fallback_value={"items": [], "next_cursor": None})
+@cached(namespace="clinics", expire=30, response_model=ClinicPage)
+async def list_clinics(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Retrieve a list of all clinics.
+    Retrieve a page of clinics ordered by ID.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
 
-    - **200**: List of clinic records.
+    - **200**: Page of clinic records.
     """
-    try:
-        result = await db.execute(select(Clinic))
-        clinics = result.scalars().all()
-        logger.info(f"Clinics listed: {len(clinics)} found")
-        return clinics
-    except Exception as e:
-        logger.error(f"Error listing clinics: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to list clinics: {str(e)}")
+    stmt = select(Clinic).order_by(Clinic.id).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(Clinic.id > sanitize_input(cursor))
+    clinics = (await db.scalars(stmt)).all()
+    logger.info("Clinics listed: %d found", len(clinics))
+    next_cursor = clinics[-1].id if len(clinics) == limit else None
+    return {"items": clinics, "next_cursor": next_cursor}
 
 
 # --------------------------
 # Update Clinic
 # --------------------------
 @router.put("/{clinic_id}", response_model=ClinicOut, tags=["Clinics"])
-@resilient()
 async def update_clinic(clinic_id: str, clinic: ClinicCreate, db: AsyncSession = Depends(get_db)):
     """
     Update an existing clinic by ID.
@@ -144,33 +140,26 @@ async def update_clinic(clinic_id: str, clinic: ClinicCreate, db: AsyncSession =
     - **404**: Clinic not found.
     - **400**: Invalid request payload.
     """
-    try:
-        clinic_id = sanitize_input(clinic_id)
-        result = await db.execute(select(Clinic).where(Clinic.id == clinic_id))
-        db_clinic = result.scalars().first()
-        if not db_clinic:
-            logger.warning(f"Clinic not found: {clinic_id}")
-            raise HTTPException(status_code=404, detail="Clinic not found")
-
-        for key, value in clinic.dict(exclude={"id"}).items():
-            setattr(db_clinic, key, sanitize_input(value)
-                    if isinstance(value, str) else value)
-
-        await db.commit()
-        await db.refresh(db_clinic)
-        logger.info(f"Clinic updated: {clinic_id}")
-        return db_clinic
-    except Exception as e:
-        logger.error(f"Error updating clinic: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to update clinic: {str(e)}")
+    clinic_id = sanitize_input(clinic_id)
+    db_clinic = await db.get(Clinic, clinic_id)
+    if not db_clinic:
+        logger.warning("Clinic not found: %s", clinic_id)
+        raise HTTPException(status_code=404, detail="Clinic not found")
+
+    data = sanitize_fields(clinic.model_dump(exclude={"id"}), _CLINIC_STR_FIELDS)
+    for key, value in data.items():
+        setattr(db_clinic, key, value)
+
+    await db.commit()
+    await invalidate("clinics")
+    logger.info("Clinic updated: %s", clinic_id)
+    return db_clinic
 
 
 # --------------------------
 # Delete Clinic
 # --------------------------
 @router.delete("/{clinic_id}", tags=["Clinics"])
-@resilient()
 async def delete_clinic(clinic_id: str, db: AsyncSession = Depends(get_db)):
     """
     Delete a clinic by ID.
@@ -178,19 +167,14 @@ async def delete_clinic(clinic_id: str, db: AsyncSession = Depends(get_db)):
     - **200**: Confirmation message if deleted.
     - **404**: Clinic not found.
     """
-    try:
-        clinic_id = sanitize_input(clinic_id)
-        result = await db.execute(select(Clinic).where(Clinic.id == clinic_id))
-        db_clinic = result.scalars().first()
-        if not db_clinic:
-            logger.warning(f"Clinic not found: {clinic_id}")
-            raise HTTPException(status_code=404, detail="Clinic not found")
-
-        await db.delete(db_clinic)
-        await db.commit()
-        logger.info(f"Clinic deleted: {clinic_id}")
-        return {"detail": "Clinic deleted"}
-    except Exception as e:
-        logger.error(f"Error deleting clinic: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to delete clinic: {str(e)}")
+    clinic_id = sanitize_input(clinic_id)
+    db_clinic = await db.get(Clinic, clinic_id)
+    if not db_clinic:
+        logger.warning("Clinic not found: %s", clinic_id)
+        raise HTTPException(status_code=404, detail="Clinic not found")
+
+    await db.delete(db_clinic)
+    await db.commit()
+    await invalidate("clinics")
+    logger.info("Clinic deleted: %s", clinic_id)
+    return {"detail": "Clinic deleted"}
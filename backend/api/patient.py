@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
 from sqlalchemy.future import select
-from backend.models.database import async_session, Patient
-from pydantic import BaseModel
-from backend.utils.resiliency import resilient, sanitize_input, SafeLogger
+from backend.models.database import get_db, Patient
+from pydantic import BaseModel, ConfigDict
+from backend.utils.resiliency import resilient, sanitize_fields, string_fields, get_safe_logger
+from backend.utils.cache import cached, invalidate
 from typing import Optional, List
 from datetime import datetime
 
 router = APIRouter()
-logger = SafeLogger(__name__)
+logger = get_safe_logger(__name__)
 
 
 # --------------------------
@@ -35,20 +37,23 @@ class PatientOut(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
 
 
-async def get_db():
-    async with async_session() as session:
-        yield session
+class PatientPage(BaseModel):
+    """Schema for a keyset-paginated page of Patients."""
+    items: List[PatientOut]
+    next_cursor: Optional[int] = None
+
+
+# String fields of PatientCreate, resolved once at import
+_PATIENT_STR_FIELDS = string_fields(PatientCreate)
 
 
 # --------------------------
 # Create Patient
 # --------------------------
 @router.post("/", response_model=PatientOut, status_code=201, tags=["Patients"])
-@resilient()
 async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new patient record.
@@ -57,26 +62,20 @@ async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_
     - **400**: Invalid request payload.
     - **500**: Internal server error.
     """
-    try:
-        db_patient = Patient(
-            **{k: sanitize_input(v) if isinstance(v, str) else v for k, v in patient.dict().items()}
-        )
-        db.add(db_patient)
-        await db.commit()
-        await db.refresh(db_patient)
-        logger.info(f"Patient created: {db_patient.id}")
-        return db_patient
-    except Exception as e:
-        logger.error(f"Error creating patient: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create patient: {str(e)}")
+    stmt = insert(Patient).values(
+        **sanitize_fields(patient.model_dump(), _PATIENT_STR_FIELDS)
+    ).returning(Patient)
+    db_patient = await db.scalar(stmt)
+    await db.commit()
+    await invalidate("patients")
+    logger.info("Patient created: %s", db_patient.id)
+    return db_patient
 
 
 # --------------------------
 # Get Patient by ID
 # --------------------------
 @router.get("/{patient_id}", response_model=PatientOut, tags=["Patients"])
-@resilient()
 async def get_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a patient by ID.
@@ -84,45 +83,42 @@ async def get_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     - **200**: Patient details.
     - **404**: Patient not found.
     """
-    try:
-        result = await db.execute(select(Patient).where(Patient.id == patient_id))
-        db_patient = result.scalars().first()
-        if not db_patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        return db_patient
-    except Exception as e:
-        logger.error(f"Error retrieving patient: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to retrieve patient: {str(e)}")
+    db_patient = await db.get(Patient, patient_id)
+    if not db_patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return db_patient
 
 
 # --------------------------
 # List Patients
 # --------------------------
-@router.get("/", response_model=List[PatientOut], tags=["Patients"])
-@resilient(fallback_value=[])
-async def list_patients(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=PatientPage, tags=["Patients"])
+@resilient(fallback_value={"items": [], "next_cursor": None})
+@cached(namespace="patients", expire=30, response_model=PatientPage)
+async def list_patients(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    List all patients.
+    List a page of patients ordered by ID.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
 
-    - **200**: List of patients.
+    - **200**: Page of patients.
     """
-    try:
-        result = await db.execute(select(Patient))
-        patients = result.scalars().all()
-        logger.info(f"Patients listed: {len(patients)} found")
-        return patients
-    except Exception as e:
-        logger.error(f"Error listing patients: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to list patients: {str(e)}")
+    stmt = select(Patient).order_by(Patient.id).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(Patient.id > cursor)
+    patients = (await db.scalars(stmt)).all()
+    logger.info("Patients listed: %d found", len(patients))
+    next_cursor = patients[-1].id if len(patients) == limit else None
+    return {"items": patients, "next_cursor": next_cursor}
 
 
 # --------------------------
 # Update Patient
 # --------------------------
 @router.put("/{patient_id}", response_model=PatientOut, tags=["Patients"])
-@resilient()
 async def update_patient(patient_id: int, patient: PatientCreate, db: AsyncSession = Depends(get_db)):
     """
     Update an existing patient record.
@@ -131,28 +127,21 @@ async def update_patient(patient_id: int, patient: PatientCreate, db: AsyncSessi
     - **404**: Patient not found.
     - **500**: Internal server error.
     """
-    try:
-        result = await db.execute(select(Patient).where(Patient.id == patient_id))
-        db_patient = result.scalars().first()
-        if not db_patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        for key, value in patient.dict(exclude={"id"}).items():
-            setattr(db_patient, key, sanitize_input(value)
-                    if isinstance(value, str) else value)
-        await db.commit()
-        await db.refresh(db_patient)
-        return db_patient
-    except Exception as e:
-        logger.error(f"Error updating patient: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to update patient: {str(e)}")
+    db_patient = await db.get(Patient, patient_id)
+    if not db_patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    data = sanitize_fields(patient.model_dump(exclude={"id"}), _PATIENT_STR_FIELDS)
+    for key, value in data.items():
+        setattr(db_patient, key, value)
+    await db.commit()
+    await invalidate("patients")
+    return db_patient
 
 
 # --------------------------
 # Delete Patient
 # --------------------------
 @router.delete("/{patient_id}", tags=["Patients"])
-@resilient()
 async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a patient by ID.
@@ -161,15 +150,10 @@ async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     - **404**: Patient not found.
     - **500**: Internal server error.
     """
-    try:
-        result = await db.execute(select(Patient).where(Patient.id == patient_id))
-        db_patient = result.scalars().first()
-        if not db_patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        await db.delete(db_patient)
-        await db.commit()
-        return {"detail": "Patient deleted"}
-    except Exception as e:
-        logger.error(f"Error deleting patient: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to delete patient: {str(e)}")
+    db_patient = await db.get(Patient, patient_id)
+    if not db_patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    await db.delete(db_patient)
+    await db.commit()
+    await invalidate("patients")
+    return {"detail": "Patient deleted"}
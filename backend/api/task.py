@@ -1,23 +1,40 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from backend.models.database import (
     async_session,
+    get_db,
     TranscriptResult,
     TaskStatus
 )
 from backend.models.schemas import VetInput
-from backend.processor.vet_transcript_processor import process_vet_transcript
-from celery.result import AsyncResult
-from pydantic import BaseModel
-from backend.utils.resiliency import resilient, sanitize_input, SafeLogger
+from backend.processor.vet_transcript_processor import process_vet_transcript, task_events_channel
+from pydantic import BaseModel, Field
+from backend.utils.resiliency import resilient, get_safe_logger
+from backend.utils.cache import redis_client, CACHE_PREFIX
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import asyncio
 import enum
+import orjson
 
-logger = SafeLogger(__name__)
+logger = get_safe_logger(__name__)
 router = APIRouter()
 
+# Seconds a terminal (completed/failed) task status is served from Redis
+TASK_STATUS_TTL = 60
+
+# Task status stream: keep-alive interval and how long a client may wait
+TASK_STREAM_HEARTBEAT = 15
+TASK_STREAM_TIMEOUT = 600
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Upper bound on task ids per batch status request
+MAX_BATCH_TASK_IDS = 100
+
 
 # --------------------------
 # Schemas
@@ -34,6 +51,82 @@ class TaskStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+class TaskStatusBatchRequest(BaseModel):
+    """Request model for looking up several task statuses at once."""
+    task_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_TASK_IDS)
+
+
+# --------------------------
+# Celery result backend
+# --------------------------
+async def get_celery_task_meta(task_id: str) -> Optional[Dict[str, Any]]:
+    """Read Celery's stored task meta from Redis without blocking the event loop."""
+    raw = await redis_client.get(f"celery-task-meta-{task_id}")
+    return orjson.loads(raw) if raw else None
+
+
+def _celery_error(result: Any) -> str:
+    """Render a serialized Celery exception the way str(exc) would."""
+    if isinstance(result, dict) and "exc_message" in result:
+        message = result["exc_message"]
+        if isinstance(message, (list, tuple)):
+            return " ".join(str(m) for m in message)
+        return str(message)
+    return str(result)
+
+
+def _status_body(status: str, result: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None) -> Dict[str, Any]:
+    return {"status": status, "result": result, "error": error}
+
+
+def _status_response(body: Dict[str, Any]) -> Response:
+    """
+    Render a TaskStatusResponse body directly. The result is JSONB that was
+    already validated when stored, so it skips a second response-model pass.
+    """
+    return Response(orjson.dumps(body), media_type="application/json")
+
+
+def _row_status(row) -> Dict[str, Any]:
+    """Status body for a transcript row (status, result, error_message)."""
+    status = row.status.lower()
+    if row.status == TaskStatus.COMPLETED:
+        return _status_body(status, result=row.result)
+    elif row.status == TaskStatus.FAILED:
+        return _status_body(status, error=row.error_message)
+    return _status_body(status)
+
+
+def _meta_status(meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Status body for a task not yet in the DB, from its Celery meta."""
+    state = meta["status"] if meta else "PENDING"
+    if state == "PENDING":
+        return _status_body("processing")
+    elif state == "SUCCESS":
+        return _status_body("completed", result=meta.get("result"))
+    elif state == "FAILURE":
+        return _status_body("failed", error=_celery_error(meta.get("result")))
+    return _status_body(state)
+
+
+def _task_status_key(task_id: str) -> str:
+    return f"{CACHE_PREFIX}:task_status:{task_id}"
+
+
+async def _cache_terminal_statuses(bodies: Dict[str, bytes]):
+    """Cache completed/failed statuses; terminal states never change."""
+    if not bodies:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for task_id, body in bodies.items():
+                pipe.setex(_task_status_key(task_id), TASK_STATUS_TTL, body)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("[Cache] SET failed for task status: %s", e)
+
+
 # --------------------------
 # Extract Tasks
 # --------------------------
@@ -47,24 +140,18 @@ async def extract_tasks(input: VetInput):
     - **400**: Invalid request payload.
     - **500**: Internal server error.
     """
-    try:
-        safe_transcript = sanitize_input(input.transcript)
-        logger.info(f"Received transcript: {safe_transcript[:50]}...")
-        task = process_vet_transcript.delay(input.model_dump())
-        logger.info(f"Started task: {task.id}")
-        return TaskIdResponse(task_id=task.id)
-    except Exception as e:
-        logger.error(f"Error starting task: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to start task: {str(e)}")
+    logger.info("Received transcript len=%d", len(input.transcript))
+    # Publishing to the broker is blocking socket I/O; keep it off the event loop
+    task = await asyncio.to_thread(process_vet_transcript.delay, input.model_dump())
+    logger.info("Started task: %s", task.id)
+    return TaskIdResponse(task_id=task.id)
 
 
 # --------------------------
 # Get Task Status
 # --------------------------
 @router.get("/task/{task_id}", response_model=TaskStatusResponse, tags=["Tasks"])
-@resilient()
-async def get_task_status(task_id: str):
+async def get_task_status(task_id: str, db: AsyncSession = Depends(get_db)):
     """
     Check the status of a task: first check DB, then Celery if not in DB.
 
@@ -72,37 +159,122 @@ async def get_task_status(task_id: str):
     - **404**: Task not found.
     - **500**: Internal server error.
     """
+    return await _task_status(task_id, db)
+
+
+async def _task_status(task_id: str, db: AsyncSession) -> Response:
+    """Look up a task's status: Redis cache, then DB, then the Celery result backend."""
     try:
-        async with async_session() as session:
-            stmt = select(TranscriptResult).where(
-                TranscriptResult.task_id == task_id)
-            result = await session.execute(stmt)
-            transcript = result.scalars().first()
-
-            if transcript:
-                status_enum = transcript.status if isinstance(
-                    transcript.status, TaskStatus) else TaskStatus(transcript.status)
-                response = {"status": status_enum.value.lower()}
-
-                if status_enum == TaskStatus.COMPLETED:
-                    response["result"] = transcript.result
-                elif status_enum == TaskStatus.FAILED:
-                    response["error"] = transcript.error_message
-
-                return response
-
-        # Fall back to Celery if task not found in DB
-        task = AsyncResult(task_id)
-        if task.state == "PENDING":
-            return {"status": "processing"}
-        elif task.state == "SUCCESS":
-            return {"status": "completed", "result": task.result}
-        elif task.state == "FAILURE":
-            return {"status": "failed", "error": str(task.result)}
-        else:
-            return {"status": task.state}
+        hit = await redis_client.get(_task_status_key(task_id))
+        if hit is not None:
+            return Response(hit, media_type="application/json")
+    except Exception as e:
+        logger.warning("[Cache] GET failed for task status: %s", e)
+
+    # Only the columns the status needs; no ORM object or relationship loads
+    stmt = select(
+        TranscriptResult.status,
+        TranscriptResult.result,
+        TranscriptResult.error_message
+    ).where(TranscriptResult.task_id == task_id)
+    transcript = (await db.execute(stmt)).first()
+
+    # Fall back to the Celery result backend if task not found in DB
+    if transcript:
+        body = _row_status(transcript)
+    else:
+        body = _meta_status(await get_celery_task_meta(task_id))
+
+    response = _status_response(body)
+    if body["status"] in TERMINAL_STATUSES:
+        await _cache_terminal_statuses({task_id: response.body})
+    return response
+
 
+# --------------------------
+# Get Task Statuses (batch)
+# --------------------------
+@router.post("/status", response_model=Dict[str, TaskStatusResponse], tags=["Tasks"])
+async def get_task_statuses(request: TaskStatusBatchRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Check the status of several tasks in one call, keyed by task ID.
+    Uses one Redis MGET, one DB query and one Celery-meta MGET for the whole batch.
+
+    - **200**: Statuses returned for every requested task.
+    - **422**: Empty list or more than 100 task IDs.
+    """
+    task_ids = list(dict.fromkeys(request.task_ids))
+    statuses: Dict[str, Any] = {}
+
+    try:
+        hits = await redis_client.mget([_task_status_key(i) for i in task_ids])
+        statuses.update((i, orjson.loads(hit)) for i, hit in zip(task_ids, hits) if hit is not None)
     except Exception as e:
-        logger.error(f"Error checking task status: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to check task status: {str(e)}")
+        logger.warning("[Cache] MGET failed for task statuses: %s", e)
+
+    missing = [i for i in task_ids if i not in statuses]
+    fresh: Dict[str, Dict[str, Any]] = {}
+    if missing:
+        stmt = select(
+            TranscriptResult.task_id,
+            TranscriptResult.status,
+            TranscriptResult.result,
+            TranscriptResult.error_message
+        ).where(TranscriptResult.task_id.in_(missing))
+        for row in (await db.execute(stmt)).all():
+            fresh[row.task_id] = _row_status(row)
+
+    missing = [i for i in missing if i not in fresh]
+    if missing:
+        metas = await redis_client.mget([f"celery-task-meta-{i}" for i in missing])
+        for task_id, raw in zip(missing, metas):
+            fresh[task_id] = _meta_status(orjson.loads(raw) if raw else None)
+
+    await _cache_terminal_statuses({
+        i: orjson.dumps(body) for i, body in fresh.items() if body["status"] in TERMINAL_STATUSES})
+    statuses.update(fresh)
+    return _status_response({i: statuses[i] for i in task_ids})
+
+
+# --------------------------
+# Stream Task Status
+# --------------------------
+async def _task_events(task_id: str):
+    """Yield the current status, then the final one once the worker publishes it."""
+    pubsub = redis_client.pubsub()
+    # Subscribe before reading the current status so a transition in between is not missed
+    await pubsub.subscribe(task_events_channel(task_id))
+    try:
+        async with async_session() as db:
+            current = (await _task_status(task_id, db)).body
+        yield b"data: " + current + b"\n\n"
+        if orjson.loads(current)["status"] in TERMINAL_STATUSES:
+            return
+
+        deadline = asyncio.get_running_loop().time() + TASK_STREAM_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=TASK_STREAM_HEARTBEAT)
+            if message is None:
+                yield b": keep-alive\n\n"
+                continue
+            yield b"data: " + message["data"] + b"\n\n"
+            return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+
+
+@router.get("/task/{task_id}/stream", tags=["Tasks"])
+async def stream_task_status(task_id: str):
+    """
+    Stream a task's status as Server-Sent Events instead of polling `/task/{task_id}`.
+    Sends the current status immediately and the final status when the task finishes;
+    each event's data has the same shape as `/task/{task_id}`.
+
+    - **200**: Event stream (`text/event-stream`).
+    """
+    return StreamingResponse(
+        _task_events(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
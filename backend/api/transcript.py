@@ -1,32 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from backend.models.database import async_session, TranscriptResult, TaskStatus
-from backend.utils.resiliency import resilient, SafeLogger
+from sqlalchemy.orm import contains_eager, raiseload
+from backend.models.database import (
+    async_session, get_db, TranscriptResult, TaskStatus, Patient, Veterinarian, Clinic
+)
+from backend.utils.resiliency import resilient, get_safe_logger
+from backend.utils.cache import cached
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, AliasChoices, AliasPath, TypeAdapter, field_validator
 from datetime import datetime
 import enum
 
-logger = SafeLogger(__name__)
+logger = get_safe_logger(__name__)
 router = APIRouter()
 
 
 # --------------------------
 # Schemas
 # --------------------------
-class TranscriptOut(BaseModel):
-    """Response model for transcript output."""
+class TranscriptSummary(BaseModel):
+    """Response model for a transcript in list views (no AI output blobs)."""
     id: int
     task_id: str
     transcript: str
     notes: Optional[str] = None
 
-    # AI output fields
-    result: Optional[Dict[str, Any]] = None      # structured VetOutput
-    raw_result: Optional[Dict[str, Any]] = None  # raw AI provider result
-    meta_extra: Optional[Dict[str, Any]] = None  # flexible extra data
-
     status: str
     error_message: Optional[str] = None
 
@@ -40,67 +40,159 @@ class TranscriptOut(BaseModel):
     veterinarian_id: Optional[str] = None
     clinic_id: Optional[str] = None
 
-    # Denormalized names for UI display (from joins)
-    patient_name: Optional[str] = None
-    veterinarian_name: Optional[str] = None
-    clinic_name: Optional[str] = None
+    # Denormalized names for UI display (read from the loaded relationships)
+    patient_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("patient_name", AliasPath("patient", "name")))
+    veterinarian_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("veterinarian_name", AliasPath("veterinarian", "name")))
+    clinic_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("clinic_name", AliasPath("clinic", "name")))
 
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True  # Allows ORM conversion
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def status_value(cls, v):
+        return v.value if isinstance(v, enum.Enum) else v
+
+
+class TranscriptOut(TranscriptSummary):
+    """Response model for transcript output."""
+    # AI output fields
+    result: Optional[Dict[str, Any]] = None      # structured VetOutput
+    raw_result: Optional[Dict[str, Any]] = None  # raw AI provider result
+    meta_extra: Optional[Dict[str, Any]] = None  # flexible extra data
+
+
+class TranscriptPage(BaseModel):
+    """Response model for a keyset-paginated page of transcripts."""
+    items: List[TranscriptSummary]
+    next_cursor: Optional[int] = None
+
+
+# Rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = 500
+
+_TRANSCRIPT_ADAPTER = TypeAdapter(TranscriptOut)
+
+
+# Columns of the list view: TranscriptSummary's fields, read without building ORM objects
+_SUMMARY_COLUMNS = (
+    TranscriptResult.id,
+    TranscriptResult.task_id,
+    TranscriptResult.transcript,
+    TranscriptResult.notes,
+    TranscriptResult.status,
+    TranscriptResult.error_message,
+    TranscriptResult.consult_date,
+    TranscriptResult.language,
+    TranscriptResult.template_id,
+    TranscriptResult.patient_id,
+    TranscriptResult.veterinarian_id,
+    TranscriptResult.clinic_id,
+    Patient.name.label("patient_name"),
+    Veterinarian.name.label("veterinarian_name"),
+    Clinic.name.label("clinic_name"),
+    TranscriptResult.created_at,
+    TranscriptResult.updated_at,
+)
+
+
+def _transcript_query():
+    """Select transcripts with patient, veterinarian and clinic joined in one query."""
+    return (
+        select(TranscriptResult)
+        .outerjoin(TranscriptResult.patient)
+        .outerjoin(TranscriptResult.veterinarian)
+        .outerjoin(TranscriptResult.clinic)
+        .options(
+            contains_eager(TranscriptResult.patient),
+            contains_eager(TranscriptResult.veterinarian),
+            contains_eager(TranscriptResult.clinic),
+            raiseload("*")   # any other relationship access is an N+1 bug
+        )
+    )
 
 
 # --------------------------
 # Get All Transcripts
 # --------------------------
-@router.get("/", response_model=List[TranscriptOut], tags=["Transcripts"])
-@resilient(fallback_value=[])
-async def get_transcripts():
+@router.get("/", response_model=TranscriptPage, tags=["Transcripts"])
+@resilient(fallback_value={"items": [], "next_cursor": None})
+@cached(namespace="transcripts", expire=10, response_model=TranscriptPage)
+async def get_transcripts(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Retrieve all transcripts with related patient, veterinarian, and clinic in one query.
+    Retrieve a page of transcripts ordered by ID, with related patient, veterinarian, and clinic.
+    AI output fields are omitted; fetch `/transcripts/{transcript_id}` for the full record.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
     - **200**: Transcripts retrieved successfully.
     - **500**: Internal server error.
     """
-    try:
-        async with async_session() as session:
-            stmt = (
-                select(TranscriptResult)
-                .options(
-                    selectinload(TranscriptResult.patient),
-                    selectinload(TranscriptResult.veterinarian),
-                    selectinload(TranscriptResult.clinic)
-                )
-            )
-            result = await session.execute(stmt)
-            transcripts = result.scalars().all()
-            results = []
-            for tr in transcripts:
-                results.append({
-                    "id": tr.id,
-                    "task_id": tr.task_id,
-                    "transcript": tr.transcript,
-                    "notes": tr.notes,
-                    "result": tr.result,
-                    "raw_result": tr.raw_result,
-                    "meta_extra": tr.meta_extra,
-                    "status": tr.status.value if isinstance(tr.status, enum.Enum) else tr.status,
-                    "error_message": tr.error_message,
-                    "consult_date": tr.consult_date.isoformat() if tr.consult_date else None,
-                    "language": tr.language,
-                    "template_id": tr.template_id,
-                    "patient_id": tr.patient_id,
-                    "veterinarian_id": tr.veterinarian_id,
-                    "clinic_id": tr.clinic_id,
-                    "patient_name": tr.patient.name if tr.patient else None,
-                    "veterinarian_name": tr.veterinarian.name if tr.veterinarian else None,
-                    "clinic_name": tr.clinic.name if hasattr(tr, "clinic") and tr.clinic else None,
-                    "created_at": tr.created_at.isoformat() if tr.created_at else None,
-                    "updated_at": tr.updated_at.isoformat() if tr.updated_at else None,
-                })
-            return results
-    except Exception as e:
-        logger.error(f"Error retrieving transcripts: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to retrieve transcripts: {str(e)}")
+    stmt = (
+        select(*_SUMMARY_COLUMNS)
+        .select_from(TranscriptResult)
+        .outerjoin(TranscriptResult.patient)
+        .outerjoin(TranscriptResult.veterinarian)
+        .outerjoin(TranscriptResult.clinic)
+        .order_by(TranscriptResult.id)
+        .limit(limit)
+    )
+    if cursor is not None:
+        stmt = stmt.where(TranscriptResult.id > cursor)
+    transcripts = (await db.execute(stmt)).mappings().all()
+    next_cursor = transcripts[-1]["id"] if len(transcripts) == limit else None
+    return {"items": transcripts, "next_cursor": next_cursor}
+
+
+# --------------------------
+# Export Transcripts
+# --------------------------
+async def _export_transcripts():
+    """Yield every transcript as one JSON array, a batch of rows at a time."""
+    async with async_session() as session:
+        stmt = _transcript_query().order_by(TranscriptResult.id).execution_options(
+            yield_per=EXPORT_BATCH_SIZE)
+        yield b"["
+        first = True
+        async for transcript in await session.stream_scalars(stmt):
+            item = _TRANSCRIPT_ADAPTER.dump_json(TranscriptOut.model_validate(transcript))
+            yield item if first else b"," + item
+            first = False
+        yield b"]"
+
+
+@router.get("/export", response_model=List[TranscriptOut], tags=["Transcripts"])
+async def export_transcripts():
+    """
+    Stream all transcripts, including AI output fields, as a JSON array.
+    Rows are fetched and serialized in batches, so memory stays bounded for large tables.
+
+    - **200**: Transcripts streamed successfully.
+    """
+    return StreamingResponse(_export_transcripts(), media_type="application/json")
+
+
+# --------------------------
+# Get Transcript by ID
+# --------------------------
+@router.get("/{transcript_id}", response_model=TranscriptOut, tags=["Transcripts"])
+async def get_transcript(transcript_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve a single transcript, including its AI output fields.
+
+    - **200**: Transcript details.
+    - **404**: Transcript not found.
+    """
+    stmt = _transcript_query().where(TranscriptResult.id == transcript_id)
+    transcript = await db.scalar(stmt)
+    if not transcript:
+        logger.warning("Transcript not found: %s", transcript_id)
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcript
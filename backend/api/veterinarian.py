@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
 from sqlalchemy.future import select
-from backend.models.database import async_session, Veterinarian
-from pydantic import BaseModel
-from backend.utils.resiliency import resilient, sanitize_input, SafeLogger
+from backend.models.database import get_db, Veterinarian
+from pydantic import BaseModel, ConfigDict
+from backend.utils.resiliency import resilient, sanitize_input, sanitize_fields, string_fields, get_safe_logger
+from backend.utils.cache import cached, invalidate
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 router = APIRouter()
-logger = SafeLogger(__name__)
+logger = get_safe_logger(__name__)
 
 # --------------------------
 # Schemas
@@ -32,13 +34,18 @@ class VeterinarianOut(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, revalidate_instances="never")
 
 
-async def get_db():
-    async with async_session() as session:
-        yield session
+class VeterinarianPage(BaseModel):
+    """Schema for a keyset-paginated page of Veterinarians."""
+    items: List[VeterinarianOut]
+    next_cursor: Optional[str] = None
+
+
+# String fields of VeterinarianCreate, resolved once at import
+_VETERINARIAN_STR_FIELDS = string_fields(VeterinarianCreate)
+
 
 # --------------------------
 # Create Veterinarian
@@ -46,7 +53,6 @@ async def get_db():
 
 
 @router.post("/", response_model=VeterinarianOut, status_code=201, tags=["Veterinarians"])
-@resilient()
 async def create_veterinarian(vet: VeterinarianCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new veterinarian record.
@@ -55,26 +61,20 @@ async def create_veterinarian(vet: VeterinarianCreate, db: AsyncSession = Depend
     - **Raises** `400`: Bad request if input is invalid.
     - **Raises** `500`: Internal server error on failure.
     """
-    try:
-        db_vet = Veterinarian(
-            **{k: sanitize_input(v) if isinstance(v, str) else v for k, v in vet.dict().items()}
-        )
-        db.add(db_vet)
-        await db.commit()
-        await db.refresh(db_vet)
-        logger.info(f"Veterinarian created: {db_vet.id}")
-        return db_vet
-    except Exception as e:
-        logger.error(f"Error creating veterinarian: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create veterinarian: {str(e)}")
+    stmt = insert(Veterinarian).values(
+        **sanitize_fields(vet.model_dump(), _VETERINARIAN_STR_FIELDS)
+    ).returning(Veterinarian)
+    db_vet = await db.scalar(stmt)
+    await db.commit()
+    await invalidate("veterinarians")
+    logger.info("Veterinarian created: %s", db_vet.id)
+    return db_vet
 
 
 # --------------------------
 # Get Veterinarian by ID
 # --------------------------
 @router.get("/{vet_id}", response_model=VeterinarianOut, tags=["Veterinarians"])
-@resilient()
 async def get_veterinarian(vet_id: str, db: AsyncSession = Depends(get_db)):
     """
     Retrieve a veterinarian by ID.
@@ -82,49 +82,46 @@ async def get_veterinarian(vet_id: str, db: AsyncSession = Depends(get_db)):
     - **Returns** `200`: Veterinarian details.
     - **Raises** `404`: If veterinarian not found.
     """
-    try:
-        vet_id = sanitize_input(vet_id)
-        result = await db.execute(select(Veterinarian).where(Veterinarian.id == vet_id))
-        vet = result.scalars().first()
-        if not vet:
-            logger.warning(f"Veterinarian not found: {vet_id}")
-            raise HTTPException(
-                status_code=404, detail="Veterinarian not found")
-        logger.info(f"Veterinarian retrieved: {vet_id}")
-        return vet
-    except Exception as e:
-        logger.error(f"Error retrieving veterinarian: {e}")
+    vet_id = sanitize_input(vet_id)
+    vet = await db.get(Veterinarian, vet_id)
+    if not vet:
+        logger.warning("Veterinarian not found: %s", vet_id)
         raise HTTPException(
-            status_code=500, detail=f"Failed to retrieve veterinarian: {str(e)}")
+            status_code=404, detail="Veterinarian not found")
+    logger.info("Veterinarian retrieved: %s", vet_id)
+    return vet
 
 
 # --------------------------
 # List Veterinarians
 # --------------------------
-@router.get("/", response_model=List[VeterinarianOut], tags=["Veterinarians"])
-@resilient(fallback_value=[])
-async def list_veterinarians(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=VeterinarianPage, tags=["Veterinarians"])
+@resilient(fallback_value={"items": [], "next_cursor": None})
+@cached(namespace="veterinarians", expire=30, response_model=VeterinarianPage)
+async def list_veterinarians(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Retrieve a list of all veterinarians.
+    Retrieve a page of veterinarians ordered by ID.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
 
-    - **Returns** `200`: List of veterinarian records.
+    - **Returns** `200`: Page of veterinarian records.
     """
-    try:
-        result = await db.execute(select(Veterinarian))
-        vets = result.scalars().all()
-        logger.info(f"Veterinarians listed: {len(vets)} found")
-        return vets
-    except Exception as e:
-        logger.error(f"Error listing veterinarians: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to list veterinarians: {str(e)}")
+    stmt = select(Veterinarian).order_by(Veterinarian.id).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(Veterinarian.id > sanitize_input(cursor))
+    vets = (await db.scalars(stmt)).all()
+    logger.info("Veterinarians listed: %d found", len(vets))
+    next_cursor = vets[-1].id if len(vets) == limit else None
+    return {"items": vets, "next_cursor": next_cursor}
 
 
 # --------------------------
 # Update Veterinarian
 # --------------------------
 @router.put("/{vet_id}", response_model=VeterinarianOut, tags=["Veterinarians"])
-@resilient()
 async def update_veterinarian(vet_id: str, vet: VeterinarianCreate, db: AsyncSession = Depends(get_db)):
     """
     Update an existing veterinarian by ID.
@@ -133,34 +130,27 @@ async def update_veterinarian(vet_id: str, vet: VeterinarianCreate, db: AsyncSes
     - **Raises** `404`: If veterinarian not found.
     - **Raises** `400`: If input is invalid.
     """
-    try:
-        vet_id = sanitize_input(vet_id)
-        result = await db.execute(select(Veterinarian).where(Veterinarian.id == vet_id))
-        db_vet = result.scalars().first()
-        if not db_vet:
-            logger.warning(f"Veterinarian not found: {vet_id}")
-            raise HTTPException(
-                status_code=404, detail="Veterinarian not found")
-
-        for key, value in vet.dict(exclude={"id"}).items():
-            setattr(db_vet, key, sanitize_input(value)
-                    if isinstance(value, str) else value)
-
-        await db.commit()
-        await db.refresh(db_vet)
-        logger.info(f"Veterinarian updated: {vet_id}")
-        return db_vet
-    except Exception as e:
-        logger.error(f"Error updating veterinarian: {e}")
+    vet_id = sanitize_input(vet_id)
+    db_vet = await db.get(Veterinarian, vet_id)
+    if not db_vet:
+        logger.warning("Veterinarian not found: %s", vet_id)
         raise HTTPException(
-            status_code=500, detail=f"Failed to update veterinarian: {str(e)}")
+            status_code=404, detail="Veterinarian not found")
+
+    data = sanitize_fields(vet.model_dump(exclude={"id"}), _VETERINARIAN_STR_FIELDS)
+    for key, value in data.items():
+        setattr(db_vet, key, value)
+
+    await db.commit()
+    await invalidate("veterinarians")
+    logger.info("Veterinarian updated: %s", vet_id)
+    return db_vet
 
 
 # --------------------------
 # Delete Veterinarian
 # --------------------------
 @router.delete("/{vet_id}", tags=["Veterinarians"])
-@resilient()
 async def delete_veterinarian(vet_id: str, db: AsyncSession = Depends(get_db)):
     """
     Delete a veterinarian by ID.
@@ -168,20 +158,15 @@ async def delete_veterinarian(vet_id: str, db: AsyncSession = Depends(get_db)):
     - **Returns** `200`: Confirmation message if deleted.
     - **Raises** `404`: If veterinarian not found.
     """
-    try:
-        vet_id = sanitize_input(vet_id)
-        result = await db.execute(select(Veterinarian).where(Veterinarian.id == vet_id))
-        db_vet = result.scalars().first()
-        if not db_vet:
-            logger.warning(f"Veterinarian not found: {vet_id}")
-            raise HTTPException(
-                status_code=404, detail="Veterinarian not found")
-
-        await db.delete(db_vet)
-        await db.commit()
-        logger.info(f"Veterinarian deleted: {vet_id}")
-        return {"detail": "Veterinarian deleted"}
-    except Exception as e:
-        logger.error(f"Error deleting veterinarian: {e}")
+    vet_id = sanitize_input(vet_id)
+    db_vet = await db.get(Veterinarian, vet_id)
+    if not db_vet:
+        logger.warning("Veterinarian not found: %s", vet_id)
         raise HTTPException(
-            status_code=500, detail=f"Failed to delete veterinarian: {str(e)}")
+            status_code=404, detail="Veterinarian not found")
+
+    await db.delete(db_vet)
+    await db.commit()
+    await invalidate("veterinarians")
+    logger.info("Veterinarian deleted: %s", vet_id)
+    return {"detail": "Veterinarian deleted"}
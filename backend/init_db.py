@@ -1,6 +1,8 @@
 import os
+import re
+import asyncio
 from sqlalchemy import create_engine, text
-from models.database import engine, Base, init_db
+from models.database import init_db
 
 # Get DB credentials from environment or config
 user = os.getenv("POSTGRES_USER")
@@ -9,17 +11,28 @@ host = os.getenv("POSTGRES_HOST")
 port = os.getenv("POSTGRES_PORT")
 target_db = os.getenv("POSTGRES_DB")
 
+# The name is interpolated into CREATE DATABASE, which cannot take bind parameters
+if not re.fullmatch(r"[A-Za-z0-9_]+", target_db or ""):
+    raise RuntimeError(f"Invalid database name: {target_db!r}")
+
 # Connect to default 'postgres' database
-default_engine = create_engine(f"postgresql://{user}:{password}@{host}:{port}/medvextract_db")
+# (CREATE DATABASE cannot run inside a transaction block)
+default_engine = create_engine(
+    f"postgresql://{user}:{password}@{host}:{port}/postgres",
+    isolation_level="AUTOCOMMIT")
 
 with default_engine.connect() as conn:
-    result = conn.execute(text(f"SELECT 1 FROM pg_database WHERE datname='{target_db}'"))
-    if not result.scalar():
-        conn.execute(text(f"CREATE DATABASE {target_db}"))
+    exists = conn.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_database WHERE datname = :name)"),
+        {"name": target_db})
+    if not exists:
+        conn.execute(text(f'CREATE DATABASE "{target_db}"'))
         print(f"Database '{target_db}' created.")
     else:
         print(f"Database '{target_db}' already exists.")
 
+default_engine.dispose()
+
 # Now run your usual SQLAlchemy metadata.create_all() for tables
-init_db()
+asyncio.run(init_db())
 print("Tables created.")
\ No newline at end of file
@@ -1,17 +1,40 @@
 from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
 import logging
 import os
+import queue
 
-from backend.VetClient.baml_vet_client import baml_vet_client
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from backend.api.clinic import router as clinic_router
 from backend.api.veterinarian import router as veterinarian_router
 from backend.api.patient import router as patient_router
 from backend.api.task import router as task_router
 from backend.api.transcript import router as transcript_router
-from backend.utils.resiliency import SafeLogger
-from fastapi.responses import RedirectResponse
+from backend.models.database import async_engine
+from backend.utils.resiliency import get_safe_logger, sync_shared_breakers, CIRCUIT_BREAKER_REDIS_URL
+from fastapi.responses import JSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per worker: start the log listener (and the shared circuit breaker sync,
+    if configured); release pooled DB connections and flush logs on shutdown.
+    """
+    log_listener.start()
+    breaker_sync = (asyncio.create_task(sync_shared_breakers())
+                    if CIRCUIT_BREAKER_REDIS_URL else None)
+    yield
+    if breaker_sync:
+        breaker_sync.cancel()
+    await async_engine.dispose()
+    log_listener.stop()
+
 
 app = FastAPI(
     title="Medical Visit Action Extraction API",
@@ -19,7 +42,8 @@ app = FastAPI(
     version="1.0.0",
     # openapi_tags can be defined here for global tags, or per router for local tags
     docs_url="/docs",
-    swagger_favicon_url="/static/favicon.ico"
+    swagger_favicon_url="/static/favicon.ico",
+    lifespan=lifespan
 )
 
 app.mount("/static", StaticFiles(directory="backend/static"), name="static")
@@ -33,15 +57,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (e.g. transcript lists); small CRUD bodies are untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# Logging (HIPAA-compliant: no PHI in logs)
-logging.basicConfig(level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
-logger = SafeLogger(__name__)
-logger.handlers = [logging.StreamHandler()]
-logger.setLevel(logging.INFO)
 
-baml_client = baml_vet_client()
+# Logging (HIPAA-compliant: no PHI in logs)
+# Request handlers only enqueue records; the listener thread (started in
+# lifespan, i.e. after any fork) does the formatting and stream I/O.
+# Set LOG_LEVEL=WARNING in production to skip per-request info logs.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+log_listener = QueueListener(log_queue, log_stream_handler)
+log_queue_handler = QueueHandler(log_queue)
+# Only merge args into the message here; the listener applies the real format
+log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+logging.basicConfig(level=LOG_LEVEL, handlers=[log_queue_handler])
+# Registered loggers (main and the routers) propagate to the root queue handler
+logger = get_safe_logger(__name__)
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """
+    Turn any unhandled endpoint error into a 500 response.
+    HTTPExceptions (e.g. 404s) are handled by FastAPI before reaching here.
+    """
+    logger.error("Unhandled error on %s %s: %s", request.method, request.url.path, exc)
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
 
 
 @app.get("/")
@@ -64,15 +110,10 @@ async def health_check():
     return {"status": "healthy"}
 
 
-# Enforce HTTPS redirect middleware
 # Enforce HTTPS redirect middleware only in production
+# (pure ASGI middleware; avoids BaseHTTPMiddleware's per-request task overhead)
 if os.getenv("ENV") == "production":
-    @app.middleware("http")
-    async def https_redirect(request: Request, call_next):
-        if request.url.scheme != "https":
-            url = request.url.replace(scheme="https")
-            return RedirectResponse(url=str(url))
-        return await call_next(request)
+    app.add_middleware(HTTPSRedirectMiddleware)
 
 
 # Routers (all endpoints now modular)
@@ -85,7 +126,7 @@ app.include_router(transcript_router, prefix="/transcripts",
 app.include_router(task_router, prefix="/tasks", tags=["Tasks"])
 
 # Resiliency & Security Best Practices:
-# - Use tenacity for retry/exponential backoff on external calls (see routers)
+# - Use retry with exponential backoff on external calls (see routers)
 # - Use pybreaker for circuit breaker on unreliable services
 # - Always validate and sanitize input
 # - Log only non-PHI/PII data
@@ -95,6 +136,16 @@ app.include_router(task_router, prefix="/tasks", tags=["Tasks"])
 # @retryable() @circuit_breaker() async def call_external(...): ...
 # value = sanitize_input(user_input)
 
+# Production: gunicorn backend.main:app -k uvicorn.workers.UvicornWorker -w $WEB_CONCURRENCY --preload
+# (see "start:backend" in package.json); this entrypoint is the single-host equivalent.
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop has no Windows build
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 2) * 2 + 1))
+    )
@@ -6,11 +6,11 @@ from dotenv import load_dotenv
 
 from sqlalchemy import (
     Column, String, Integer, DateTime, ForeignKey,
-    Enum, Index, func
+    Enum, Index, func, text
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base, relationship
 
 # ---------------------------------------------------------
 # Load environment variables
@@ -30,10 +30,26 @@ if not all([user, password, host, port, target_db]):
 # Database Configuration (Async Engine & Session)
 # ---------------------------------------------------------
 ASYNC_DATABASE_URL = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{target_db}"
-async_engine = create_async_engine(ASYNC_DATABASE_URL, future=True, echo=False)
-async_session = sessionmaker(
-    async_engine, expire_on_commit=False, class_=AsyncSession
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    future=True,
+    echo=False,
+    pool_size=int(os.getenv("DB_POOL_SIZE", 20)),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 40)),
+    pool_pre_ping=True,     # drop connections killed by Postgres idle timeouts
+    pool_recycle=1800,      # seconds before a pooled connection is replaced
+    pool_use_lifo=True,     # reuse warm connections; let surplus ones idle out
+    # Small OLTP queries never benefit from JIT, only pay its planning cost
+    connect_args={"server_settings": {"jit": "off"}}
 )
+async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_db():
+    """FastAPI dependency yielding one request-scoped AsyncSession."""
+    async with async_session() as session:
+        yield session
+
 
 Base = declarative_base()
 
@@ -42,7 +58,7 @@ Base = declarative_base()
 # ---------------------------------------------------------
 
 
-class TaskStatus(enum.Enum):
+class TaskStatus(str, enum.Enum):
     PENDING = "PENDING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
@@ -58,6 +74,10 @@ class TimestampMixin:
     updated_at = Column(DateTime(timezone=True),
                         onupdate=func.now(), nullable=True)
 
+    # Fetch server-stamped timestamps via RETURNING on INSERT/UPDATE,
+    # so no refresh() round trip is needed to read them back
+    __mapper_args__ = {"eager_defaults": True}
+
 # ---------------------------------------------------------
 # Models
 # ---------------------------------------------------------
@@ -124,7 +144,9 @@ class TranscriptResult(Base, TimestampMixin):
     # Flexible extra data (if any)
     meta_extra = Column(JSONB, nullable=True)
 
-    status = Column(Enum(TaskStatus),
+    # Native Postgres enum storing the member values; str members need no conversion
+    status = Column(Enum(TaskStatus, name="taskstatus", native_enum=True,
+                         values_callable=lambda e: [m.value for m in e]),
                     default=TaskStatus.PENDING, nullable=False)
     error_message = Column(String)
 
@@ -139,17 +161,21 @@ class TranscriptResult(Base, TimestampMixin):
         "veterinarians.id"), nullable=False)
     clinic_id = Column(String, ForeignKey("clinics.id"), nullable=False)
 
-    # ORM relationships
-    patient = relationship("Patient", back_populates="transcripts")
-    veterinarian = relationship("Veterinarian", back_populates="transcripts")
-    clinic = relationship("Clinic")
+    # ORM relationships (many-to-one: batch-load by PK IN (...) unless a query says otherwise)
+    patient = relationship("Patient", back_populates="transcripts", lazy="selectin")
+    veterinarian = relationship("Veterinarian", back_populates="transcripts", lazy="selectin")
+    clinic = relationship("Clinic", lazy="selectin")
 
     __table_args__ = (
         Index("idx_transcripts_consult_date", "consult_date"),
         Index("idx_transcripts_patient_id", "patient_id"),
         Index("idx_transcripts_vet_id", "veterinarian_id"),
         Index("idx_transcripts_clinic_id", "clinic_id"),
-        Index("idx_transcripts_status", "status"),
+        # Composite also serves plain status lookups (leftmost prefix)
+        Index("idx_transcripts_status_created", "status", "created_at"),
+        # Only pending rows: keeps the queue-scan working set tiny
+        Index("idx_transcripts_pending_created", "created_at",
+              postgresql_where=text("status = 'PENDING'")),
     )
 
 # ---------------------------------------------------------
@@ -158,6 +184,10 @@ class TranscriptResult(Base, TimestampMixin):
 
 
 async def init_db():
-    """Initialize database tables asynchronously."""
+    """
+    Initialize database tables asynchronously.
+    Skips create_all's per-table checks when the schema already exists.
+    """
     async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        if await conn.scalar(text("SELECT to_regclass('transcript_results')")) is None:
+            await conn.run_sync(Base.metadata.create_all)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, WrapValidator
+from typing import Annotated, List, Optional
 from datetime import date, datetime
 from enum import Enum
 
@@ -40,17 +40,38 @@ class ReminderCategory(str, Enum):
     OTHER = "OTHER"
 
 
+# ---------------------------
+# BAML result unwrapping
+# ---------------------------
+def _unwrap_baml(value, handler):
+    """Unwrap BAML Checked values ({"value": ..., "checks": ...}) and enums during validation."""
+    if isinstance(value, dict) and "value" in value and isinstance(value["value"], (str, int, float)):
+        value = value["value"]
+    elif isinstance(value, Enum):
+        value = value.value.upper()
+    return handler(value)
+
+
+Unwrapped = WrapValidator(_unwrap_baml)
+
+
 # ---------------------------
 # Output Component Models
 # ---------------------------
+# Output models defer building their validators/serializers until first use:
+# the API process and cache-hit tasks never touch them. Enum fields keep the
+# plain string value, so dumping needs no enum conversion.
 class FollowUpTask(BaseModel):
-    description: str
-    due_date: Optional[date] = None
-    assigned_to: Optional[str] = None
-    status: TaskStatus
-    context: Optional[str] = None
+    description: Annotated[str, Unwrapped]
+    # Free text from the model (BAML `string?`); usually ISO 8601 but not guaranteed
+    due_date: Annotated[Optional[str], Unwrapped] = None
+    assigned_to: Annotated[Optional[str], Unwrapped] = None
+    status: Annotated[TaskStatus, Unwrapped]
+    context: Annotated[Optional[str], Unwrapped] = None
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "description": "Schedule blood panel for Fluffy",
             "due_date": "2025-07-22",
@@ -62,14 +83,16 @@ class FollowUpTask(BaseModel):
 
 
 class MedicationInstruction(BaseModel):
-    medication: str
-    dosage: str
-    frequency: str
-    duration: Optional[str] = None
-    route: Optional[MedicationRoute] = None
-    conditions: Optional[str] = None
+    medication: Annotated[str, Unwrapped]
+    dosage: Annotated[str, Unwrapped]
+    frequency: Annotated[str, Unwrapped]
+    duration: Annotated[Optional[str], Unwrapped] = None
+    route: Annotated[Optional[MedicationRoute], Unwrapped] = None
+    conditions: Annotated[Optional[str], Unwrapped] = None
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "medication": "Cerenia",
             "dosage": "2 mg/kg",
@@ -82,11 +105,13 @@ class MedicationInstruction(BaseModel):
 
 
 class ClientReminder(BaseModel):
-    description: str
-    priority: Priority
-    category: ReminderCategory
+    description: Annotated[str, Unwrapped]
+    priority: Annotated[Priority, Unwrapped]
+    category: Annotated[ReminderCategory, Unwrapped]
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "description": "Monitor Fluffy’s water intake closely",
             "priority": "HIGH",
@@ -96,12 +121,15 @@ class ClientReminder(BaseModel):
 
 
 class VetToDo(BaseModel):
-    description: str
-    due_date: Optional[date] = None
-    status: TaskStatus
-    related_task_id: Optional[str] = None
+    description: Annotated[str, Unwrapped]
+    # Free text from the model (BAML `string?`); usually ISO 8601 but not guaranteed
+    due_date: Annotated[Optional[str], Unwrapped] = None
+    status: Annotated[TaskStatus, Unwrapped]
+    related_task_id: Annotated[Optional[str], Unwrapped] = None
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "description": "Export notes to Ezyvet",
             "due_date": "2025-07-16",
@@ -112,15 +140,17 @@ class VetToDo(BaseModel):
 
 
 class SOAPNote(BaseModel):
-    subjective: str
-    objective: str
-    assessment: str
-    plan: str
-    note_type: NoteType
-    template_id: Optional[str] = None
-    discharge_summary: Optional[str] = None
+    subjective: Annotated[str, Unwrapped]
+    objective: Annotated[str, Unwrapped]
+    assessment: Annotated[str, Unwrapped]
+    plan: Annotated[str, Unwrapped]
+    note_type: Annotated[NoteType, Unwrapped]
+    template_id: Annotated[Optional[str], Unwrapped] = None
+    discharge_summary: Annotated[Optional[str], Unwrapped] = None
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "subjective": "Owner reports Fluffy has been vomiting and has reduced appetite.",
             "objective": "Dehydrated, mild fever detected during exam.",
@@ -142,9 +172,11 @@ class VetOutput(BaseModel):
     client_reminders: List[ClientReminder]
     vet_todos: List[VetToDo]
     soap_notes: List[SOAPNote]
-    warnings: List[str]
+    warnings: List[Annotated[str, Unwrapped]]
 
     model_config = ConfigDict(
+        defer_build=True,
+        use_enum_values=True,
         json_schema_extra={"example": {
             "follow_up_tasks": [{
                 "description": "Schedule blood panel for Fluffy",
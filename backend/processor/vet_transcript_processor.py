@@ -4,11 +4,11 @@ vet_transcript_processor.py
 Async Celery task for veterinary consult transcript processing:
 
 Workflow:
- - Validate incoming VetInput with Pydantic v2
- - Generate cache key and check Redis
- - If no cache hit: Insert PENDING TranscriptResult into Postgres
+ - Generate cache key from the raw input and check Redis
+ - If no cache hit: validate VetInput with Pydantic v2
+ - Insert PENDING TranscriptResult into Postgres
  - Call AI model (b.ExtractVetTasks) to get VetOutput
- - Sanitize output (remove Pydantic wrappers, enums to strings)
+ - Validate output into VetOutput (unwraps Checked values, enums to strings)
  - Update DB record to COMPLETED with raw & sanitized results
  - Store sanitized result in Redis (24h expiry)
  - If any error occurs: update DB to FAILED with error message, log traceback
@@ -22,42 +22,109 @@ Tech Stack:
 
 
 import os
+import asyncio
 import logging
-import hashlib
-import json
-import redis
+import orjson
+import redis.asyncio as aioredis
+import xxhash
 from enum import Enum
 from celery import Celery
-from backend.models.database import async_session, TranscriptResult
-from sqlalchemy.future import select
+from celery.signals import task_failure, task_success, worker_process_init, worker_process_shutdown
+from kombu.serialization import register
+from backend.models.database import async_engine, async_session, TranscriptResult, TaskStatus
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from baml_client.async_client import b
-from backend.models.schemas import TaskStatus, VetInput
-from pydantic import BaseModel
+from backend.models.schemas import VetInput, VetOutput
+from pydantic import TypeAdapter, ValidationError
 
 # Redis URL
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# orjson for task messages and results; stdlib "json" is still accepted
+register("orjson", orjson.dumps, orjson.loads,
+         content_type="application/x-orjson", content_encoding="utf-8")
+
 # Celery
 app = Celery("tasks", broker=REDIS_URL, backend=REDIS_URL)
 app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
     result_expires=3600
 )
 
-# Redis cache client
-redis_client = redis.from_url(REDIS_URL)
+# Redis client (async, pooled) for the result cache and status events
+redis_pool = aioredis.ConnectionPool.from_url(
+    REDIS_URL, max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)))
+redis_client = aioredis.Redis(connection_pool=redis_pool)
 logger = logging.getLogger(__name__)
 
+# Validates task input straight from the dict, without BaseModel.__init__(**kwargs)
+_VET_INPUT_ADAPTER = TypeAdapter(VetInput)
+
+# VetInput fields stored as TranscriptResult columns
+_ENTRY_FIELDS = (
+    "transcript", "notes", "patient_id", "consult_date",
+    "veterinarian_id", "clinic_id", "template_id", "language"
+)
+
+
+# Event loop shared by every task in this worker process, so the DB, Redis
+# and BAML HTTP connection pools outlive a single task
+_loop = None
+
+
+def run_async(coro):
+    """Run a coroutine to completion on this worker process's event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs):
+    """Give each forked worker process its own fresh loop and connection pools."""
+    global _loop
+    _loop = None
+    # Drop any DB connections inherited from the parent without closing them for it
+    async_engine.sync_engine.dispose(close=False)
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs):
+    """Close pooled connections and the loop when the worker process exits."""
+    if _loop is None or _loop.is_closed():
+        return
+
+    async def close_pools():
+        await redis_pool.disconnect()
+        await async_engine.dispose()
+    _loop.run_until_complete(close_pools())
+    _loop.close()
+
 
-def get_cache_key(vet_input: VetInput) -> str:
-    """Generate MD5 cache key from VetInput."""
-    input_str = json.dumps(vet_input.model_dump(mode="json"), sort_keys=True)
-    return hashlib.md5(input_str.encode("utf-8")).hexdigest()
+def task_events_channel(task_id: str) -> str:
+    """Redis pub/sub channel on which a task's final status is published."""
+    return f"task-events:{task_id}"
+
+
+async def publish_task_event(task_id: str, status: str, result=None, error=None):
+    """Push a task's final status to SSE subscribers (same shape as /task/{task_id})."""
+    try:
+        await redis_client.publish(task_events_channel(task_id), orjson.dumps(
+            {"status": status, "result": result, "error": error}))
+    except Exception as e:
+        logger.warning("[%s] Redis publish failed: %s", task_id, e)
 
 
 def sanitize_payload(obj):
+    """
+    Lenient fallback for results VetOutput rejects: unwrap BAML Checked values
+    and enums the same way VetOutput's validators do, leave the rest as-is.
+    """
     if isinstance(obj, dict):
         if "value" in obj and isinstance(obj["value"], (str, int, float)):
             return obj["value"]
@@ -65,68 +132,83 @@ def sanitize_payload(obj):
     elif isinstance(obj, list):
         return [sanitize_payload(i) for i in obj]
     elif isinstance(obj, Enum):
-        return obj.value
-    elif isinstance(obj, BaseModel):
-        return sanitize_payload(obj.model_dump())
+        return obj.value.upper()
     return obj
 
 
+def get_cache_key(input_data: dict) -> str:
+    """
+    Generate xxh3-128 cache key from the task's JSON input, keys sorted.
+    Works on the raw dict (already JSON-clean from the broker) so a cache
+    hit needs no VetInput validation.
+    """
+    return xxhash.xxh3_128_hexdigest(orjson.dumps(input_data, option=orjson.OPT_SORT_KEYS))
+
+
 async def _process_vet_transcript(task_id: str, input_data: dict) -> dict:
-    vet_input = VetInput(**input_data)
-    cache_key = get_cache_key(vet_input)
+    cache_key = get_cache_key(input_data)
 
     # --- Check cache
     try:
-        cached = redis_client.get(cache_key)
+        cached = await redis_client.get(cache_key)
         if cached:
-            logger.info(f"[{task_id}] Cache HIT {cache_key}")
-            return json.loads(cached)
+            logger.info("[%s] Cache HIT %s len=%d", task_id, cache_key, len(cached))
+            return orjson.loads(cached)
     except Exception as e:
-        logger.warning(f"[{task_id}] Redis get failed: {e}")
+        logger.warning("[%s] Redis get failed: %s", task_id, e)
+
+    vet_input = _VET_INPUT_ADAPTER.validate_python(input_data)
 
-    # --- Store initial DB entry
+    # --- Store initial DB entry (status pollers see PENDING while the model runs)
+    fields = vet_input.__dict__
+    entry_values = {"task_id": task_id, **{k: fields[k] for k in _ENTRY_FIELDS}}
     async with async_session() as db:
-        db_entry = TranscriptResult(
-            task_id=task_id,
-            transcript=vet_input.transcript,
-            notes=vet_input.notes,
-            status=TaskStatus.PENDING,
-            patient_id=vet_input.patient_id,
-            consult_date=vet_input.consult_date,
-            veterinarian_id=vet_input.veterinarian_id,
-            clinic_id=vet_input.clinic_id,
-            template_id=vet_input.template_id,
-            language=vet_input.language
-        )
-        db.add(db_entry)
+        # Core INSERT: no ORM object, identity map or unit-of-work flush
+        await db.execute(insert(TranscriptResult).values(**entry_values, status=TaskStatus.PENDING))
         await db.commit()
-        logger.info(f"[{task_id}] Stored initial PENDING transcript")
+        logger.info("[%s] Stored initial PENDING transcript", task_id)
 
     # --- Run extraction task
-    logger.info(f"[{task_id}] Calling ExtractVetTasks...")
+    logger.info("[%s] Calling ExtractVetTasks...", task_id)
     result = await b.ExtractVetTasks(vet_input)
     result_dict = result.model_dump()
-    sanitized_result = sanitize_payload(result_dict)
+    try:
+        # VetOutput unwraps Checked values and enums while validating
+        output = VetOutput.model_validate(result_dict)
+    except ValidationError as e:
+        # Model output drifted from the schema: store it unwrapped rather than fail the task
+        logger.warning("[%s] Result does not match VetOutput, storing it unvalidated: %s", task_id, e)
+        sanitized_result = sanitize_payload(result_dict)
+        cache_payload = orjson.dumps(sanitized_result)
+    else:
+        sanitized_result = output.model_dump(mode="json")
+        # Cache bytes straight from pydantic-core, no second walk over the dict
+        cache_payload = output.__pydantic_serializer__.to_json(output)
 
-    # --- Update DB with result
+    # --- Upsert the result: one statement, no SELECT of the PENDING row
+    completed = dict(
+        raw_result=result_dict,
+        result=sanitized_result,
+        status=TaskStatus.COMPLETED
+    )
+    stmt = insert(TranscriptResult).values(**entry_values, **completed)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TranscriptResult.task_id],
+        # Reuse the proposed row's values instead of binding the JSONB twice;
+        # ON CONFLICT does not apply Column.onupdate, so stamp updated_at here
+        set_={**{k: stmt.excluded[k] for k in completed}, "updated_at": func.now()}
+    )
     async with async_session() as db:
-        res = await db.execute(
-            select(TranscriptResult).where(TranscriptResult.task_id == task_id)
-        )
-        db_entry = res.scalars().first()
-        if db_entry:
-            db_entry.raw_result = result_dict
-            db_entry.result = sanitized_result
-            db_entry.status = TaskStatus.COMPLETED
-            await db.commit()
-            logger.info(f"[{task_id}] Updated DB entry => COMPLETED")
+        await db.execute(stmt)
+        await db.commit()
+        logger.info("[%s] Upserted DB entry => COMPLETED", task_id)
 
     # --- Update cache
     try:
-        redis_client.setex(cache_key, 86400, json.dumps(sanitized_result))
-        logger.info(f"[{task_id}] Cached result in Redis")
+        await redis_client.setex(cache_key, 86400, cache_payload)
+        logger.info("[%s] Cached result in Redis", task_id)
     except Exception as e:
-        logger.warning(f"[{task_id}] Redis setex failed: {e}")
+        logger.warning("[%s] Redis setex failed: %s", task_id, e)
 
     return sanitized_result
 
@@ -135,22 +217,41 @@ async def _process_vet_transcript(task_id: str, input_data: dict) -> dict:
 def process_vet_transcript(self, input: dict):
     """Celery task: Process veterinary transcript asynchronously."""
     try:
-        return asyncio.run(_process_vet_transcript(self.request.id, input))
+        return run_async(_process_vet_transcript(self.request.id, input))
     except Exception as e:
         logger.exception(
-            f"[{self.request.id}] Failed to process transcript: {e}")
+            "[%s] Failed to process transcript: %s", self.request.id, e)
         # Update DB status to FAILED
 
         async def fail_entry():
             async with async_session() as db:
-                res = await db.execute(
-                    select(TranscriptResult).where(
-                        TranscriptResult.task_id == self.request.id)
+                await db.execute(
+                    update(TranscriptResult)
+                    .where(TranscriptResult.task_id == self.request.id)
+                    .values(status=TaskStatus.FAILED, error_message=str(e))
                 )
-                entry = res.scalars().first()
-                if entry:
-                    entry.status = TaskStatus.FAILED
-                    entry.error_message = str(e)
-                    await db.commit()
-        asyncio.run(fail_entry())
+                await db.commit()
+        run_async(fail_entry())
         raise
+
+
+@task_success.connect
+def _publish_task_completed(sender=None, result=None, **kwargs):
+    """
+    Publish completion after Celery has stored the result meta (task_success
+    fires after mark_as_done), so a cache hit with no DB row is visible too.
+    """
+    if sender is None or sender.name != process_vet_transcript.name:
+        return
+    run_async(publish_task_event(sender.request.id, "completed", result=result))
+
+
+@task_failure.connect
+def _publish_task_failed(sender=None, task_id=None, exception=None, **kwargs):
+    """
+    Publish failure after Celery has stored the FAILURE meta (task_failure
+    fires after mark_as_failure), mirroring _publish_task_completed.
+    """
+    if sender is None or sender.name != process_vet_transcript.name:
+        return
+    run_async(publish_task_event(task_id, "failed", error=str(exception)))
@@ -0,0 +1,9 @@
+"""
+Celery entry point (`celery -A backend.task worker`).
+
+The task and its Celery app live in backend/processor/vet_transcript_processor.py;
+this module only re-exports them so there is a single definition of each.
+"""
+from backend.processor.vet_transcript_processor import app, process_vet_transcript
+
+__all__ = ["app", "process_vet_transcript"]
@@ -0,0 +1,90 @@
+import functools
+import logging
+import os
+import orjson
+import redis.asyncio as aioredis
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Shared async Redis client for the API (response cache, Celery task meta)
+redis_client = aioredis.from_url(REDIS_URL)
+
+CACHE_PREFIX = "cache"
+
+
+def _cache_key(namespace, func_name, kwargs):
+    """Build a key from endpoint name and scalar query/path params only."""
+    params = ",".join(
+        f"{k}={v}" for k, v in sorted(kwargs.items())
+        if isinstance(v, (str, int, float, bool, type(None)))
+    )
+    return f"{CACHE_PREFIX}:{namespace}:{func_name}:{params}"
+
+
+def _namespace_index(namespace):
+    """Redis set of the cache keys written under a namespace."""
+    return f"{CACHE_PREFIX}-index:{namespace}"
+
+
+def cached(namespace, expire=30, response_model=None):
+    """
+    Cache an endpoint's serialized JSON response in Redis.
+    The response model's TypeAdapter is built once at decoration time and the
+    JSON body is returned directly, skipping FastAPI's response-model pass.
+    Dependency arguments (e.g. DB sessions) are not part of the key.
+    Redis failures are logged and the call falls through to the endpoint.
+    Keys are indexed per namespace for invalidate(); the index expires with
+    its newest key, so use one expire per namespace.
+    """
+    def decorator(func):
+        adapter = TypeAdapter(response_model) if response_model else None
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _cache_key(namespace, func.__name__, kwargs)
+            try:
+                hit = await redis_client.get(key)
+                if hit is not None:
+                    return Response(hit, media_type="application/json")
+            except Exception as e:
+                logger.warning("[Cache] GET failed for %s: %s", namespace, e)
+
+            result = await func(*args, **kwargs)
+            if adapter:
+                body = adapter.dump_json(
+                    adapter.validate_python(result, from_attributes=True))
+            else:
+                body = orjson.dumps(result)
+
+            try:
+                # Index the key under its namespace in the same round trip, so
+                # invalidate() deletes by membership instead of scanning Redis
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.setex(key, expire, body)
+                    pipe.sadd(_namespace_index(namespace), key)
+                    pipe.expire(_namespace_index(namespace), expire)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning("[Cache] SET failed for %s: %s", namespace, e)
+            return Response(body, media_type="application/json")
+        return wrapper
+    return decorator
+
+
+async def invalidate(namespace):
+    """Drop every cached response stored under a namespace."""
+    index = _namespace_index(namespace)
+    try:
+        # Read and clear the index atomically; keys cached afterwards land in a new one
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.smembers(index)
+            pipe.delete(index)
+            keys, _ = await pipe.execute()
+        if keys:
+            await redis_client.delete(*keys)
+    except Exception as e:
+        logger.warning("[Cache] Invalidate failed for %s: %s", namespace, e)
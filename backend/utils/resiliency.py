@@ -1,69 +1,290 @@
 import functools
 import logging
+import os
 import asyncio
+import random
 import pybreaker
-from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential, retry_if_exception_type
+import redis.asyncio as aioredis
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Set to share circuit state between worker processes through Redis
+CIRCUIT_BREAKER_REDIS_URL = os.getenv("CIRCUIT_BREAKER_REDIS_URL")
+# Seconds between reconciling local breaker state with the shared copy
+CIRCUIT_BREAKER_SYNC_INTERVAL = float(os.getenv("CIRCUIT_BREAKER_SYNC_INTERVAL", 1))
+
+
+class SharedCircuitStorage(pybreaker.CircuitMemoryStorage):
+    """
+    Breaker state served from process memory, so the request path never waits
+    on Redis. sync() pushes local failures (INCRBY) and transitions (SET) and
+    pulls the shared state, failure counter and opened_at back in one
+    round trip; sync_shared_breakers() runs it in the background.
+    """
+
+    def __init__(self, name):
+        super().__init__(pybreaker.STATE_CLOSED)
+        self._prefix = f"{name}:pybreaker"
+        self._pending = {}
+        self._pending_incr = 0
+        self._pending_reset = False
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = self._pending["state"] = state
+
+    def increment_counter(self):
+        super().increment_counter()
+        self._pending_incr += 1
+
+    def reset_counter(self):
+        super().reset_counter()
+        self._pending_reset, self._pending_incr = True, 0
+
+    @property
+    def opened_at(self):
+        return self._opened_at
+
+    @opened_at.setter
+    def opened_at(self, now):
+        self._opened_at = now
+        self._pending["opened_at"] = int(now.timestamp())
+
+    def _key(self, field):
+        return f"{self._prefix}:{field}"
+
+    async def sync(self, client):
+        """Reconcile with Redis; local changes made meanwhile win over what is pulled."""
+        pending, incr, reset = self._pending, self._pending_incr, self._pending_reset
+        self._pending, self._pending_incr, self._pending_reset = {}, 0, False
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                if reset:
+                    pipe.set(self._key("fail_counter"), 0)
+                if incr:
+                    pipe.incrby(self._key("fail_counter"), incr)
+                if pending:
+                    pipe.mset({self._key(k): v for k, v in pending.items()})
+                pipe.mget(self._key("state"), self._key("fail_counter"), self._key("opened_at"))
+                state, counter, opened_at = (await pipe.execute())[-1]
+        except Exception:
+            # Keep the changes for the next attempt
+            self._pending = {**pending, **self._pending}
+            self._pending_incr += incr
+            self._pending_reset = self._pending_reset or reset
+            raise
+        if state and "state" not in self._pending:
+            self._state = state.decode()
+        if opened_at and "opened_at" not in self._pending:
+            self._opened_at = datetime.fromtimestamp(int(opened_at), timezone.utc)
+        if not self._pending_reset:
+            self._fail_counter = int(counter or 0) + self._pending_incr
+
+
+# Storages kept in sync with Redis by sync_shared_breakers()
+_shared_storages = []
+
+
+def breaker_storage(name):
+    """
+    State storage for a circuit breaker: in-process by default. With
+    CIRCUIT_BREAKER_REDIS_URL set, the state is also shared through Redis under
+    the breaker's name, so a circuit opened by one worker process protects all
+    of them within CIRCUIT_BREAKER_SYNC_INTERVAL.
+    """
+    if not CIRCUIT_BREAKER_REDIS_URL:
+        return pybreaker.CircuitMemoryStorage(pybreaker.STATE_CLOSED)
+    storage = SharedCircuitStorage(name)
+    _shared_storages.append(storage)
+    return storage
+
+
+async def sync_shared_breakers():
+    """Background task (started in the API lifespan) reconciling shared breakers with Redis."""
+    client = aioredis.from_url(CIRCUIT_BREAKER_REDIS_URL)
+    try:
+        while True:
+            for storage in _shared_storages:
+                try:
+                    await storage.sync(client)
+                except Exception as e:
+                    logger.warning("[CircuitBreaker] Sync with Redis failed for %s: %s",
+                                   storage._prefix, e)
+            await asyncio.sleep(CIRCUIT_BREAKER_SYNC_INTERVAL)
+    finally:
+        await client.aclose()
+
+
 # Shared global circuit breaker instance with tuned params if you want
 global_breaker = pybreaker.CircuitBreaker(
     fail_max=5,           # max consecutive failures before open
     reset_timeout=60,     # seconds until half-open retry allowed
-    name="global_breaker"
+    success_threshold=3,  # successful trial calls before fully closing
+    name="global_breaker",
+    state_storage=breaker_storage("global_breaker")
 )
 
 
+# Half-open trial calls in flight per breaker; callers beyond the ramp fail fast
+_probing = {}
+
+
+async def _closed_call(breaker, func, *args, **kwargs):
+    """
+    Fast path for a closed circuit: await func directly, skipping call_async's
+    lock and tornado coroutine, and do the same bookkeeping pybreaker would.
+    """
+    # The public listeners property copies them into a new tuple on every access
+    listeners = breaker._listeners
+    for listener in listeners:
+        listener.before_call(breaker, func, *args, **kwargs)
+    try:
+        ret = await func(*args, **kwargs)
+    except Exception as e:
+        # Counts system errors (opening the circuit at fail_max) and re-raises.
+        # CancelledError (client disconnects, timeouts) passes through uncounted.
+        breaker.state._handle_error(e)
+    storage = breaker._state_storage
+    if storage.counter:
+        storage.reset_counter()
+    for listener in listeners:
+        listener.success(breaker)
+    return ret
+
+
+async def _breaker_call(breaker, func, *args, **kwargs):
+    """
+    breaker.call_async, letting traffic back onto a recovering circuit gradually.
+    pybreaker's own open -> half-open step runs the coroutine function
+    synchronously (counting an unawaited coroutine as success), so the
+    transition is made here and trial calls are awaited like any other.
+    While half-open, success_counter + 1 concurrent trial calls are admitted,
+    ramping up until breaker.success_threshold successes close the circuit.
+    """
+    state = breaker.current_state
+    if state == pybreaker.STATE_CLOSED:
+        return await _closed_call(breaker, func, *args, **kwargs)
+
+    in_flight = _probing.get(breaker, 0)
+    if state == pybreaker.STATE_OPEN:
+        if in_flight:
+            raise pybreaker.CircuitBreakerError("Trial call in progress, circuit breaker still open")
+        opened_at = breaker._state_storage.opened_at
+        if opened_at and datetime.now(timezone.utc) < opened_at + timedelta(seconds=breaker.reset_timeout):
+            raise pybreaker.CircuitBreakerError("Timeout not elapsed yet, circuit breaker still open")
+        breaker.half_open()
+    elif in_flight > breaker._state_storage.success_counter:
+        raise pybreaker.CircuitBreakerError("Trial calls in progress, circuit breaker still half-open")
+
+    _probing[breaker] = in_flight + 1
+    try:
+        return await breaker.call_async(func, *args, **kwargs)
+    finally:
+        if _probing[breaker] > 1:
+            _probing[breaker] -= 1
+        else:
+            del _probing[breaker]
+
+
+def _retrying(func, attempts, wait_min, wait_max, exceptions, fname=None):
+    """
+    Bare retry loop around func (no functools.wraps); func itself when
+    there is nothing to retry.
+    """
+    if attempts <= 1 or not exceptions:
+        return func
+
+    fname = fname or getattr(func, "__qualname__", func.__name__)
+
+    async def retried(*args, **kwargs):
+        for attempt in range(1, attempts + 1):
+            try:
+                return await func(*args, **kwargs)
+            except pybreaker.CircuitBreakerError:
+                # An open circuit must fail fast, never back off and retry
+                raise
+            except exceptions:
+                if attempt == attempts:
+                    raise
+                # Full jitter: a random wait in [0, cap], so clients failing together
+                # do not retry in lockstep against a recovering service; wait_min only
+                # raises the cap of the early attempts
+                cap = max(wait_min, min(2 ** (attempt - 1), wait_max))
+                delay = random.uniform(0, cap)
+                logger.debug("[Retry] Attempt %d for %s failed; retrying in %.2fs",
+                             attempt, fname, delay)
+                await asyncio.sleep(delay)
+    return retried
+
+
 def async_retry(attempts=3, wait_min=1, wait_max=10, exceptions=(Exception,)):
     """
-    Retry with exponential backoff.
+    Retry with jittered exponential backoff.
+    With attempts <= 1 or no exceptions to retry on, the function is returned as-is.
     """
     def decorator(func):
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(attempts),
-                wait=wait_exponential(
-                    multiplier=1, min=wait_min, max=wait_max),
-                retry=retry_if_exception_type(exceptions),
-                reraise=True
-            ):
-                with attempt:
-                    logger.debug(
-                        f"[Retry] Attempt {attempt.retry_state.attempt_number} for {func.__name__}")
-                    return await func(*args, **kwargs)
-        return wrapper
+        retried = _retrying(func, attempts, wait_min, wait_max, exceptions)
+        if retried is func:
+            return func
+        return functools.wraps(func)(retried)
     return decorator
 
 
 def async_circuit_breaker(breaker=global_breaker):
     """
-    Async-friendly circuit breaker using pybreaker.call_async.
+    Async-friendly circuit breaker; see _breaker_call.
     """
     def decorator(func):
+        fname = getattr(func, "__qualname__", func.__name__)
+        bname = breaker.name
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             try:
-                return await breaker.call_async(func, *args, **kwargs)
+                return await _breaker_call(breaker, func, *args, **kwargs)
             except pybreaker.CircuitBreakerError:
-                logger.warning(
-                    f"[CircuitBreaker] {breaker.name} OPEN — blocking call to {func.__name__}")
+                logger.warning("[CircuitBreaker] %s OPEN — blocking call to %s",
+                               bname, fname)
                 raise
         return wrapper
     return decorator
 
 
-def async_fallback(fallback_value=None, handler=None):
+# Expected failures (open circuit, timeout, dropped connection): logged without a traceback
+TRANSIENT_EXCEPTIONS = (pybreaker.CircuitBreakerError, asyncio.TimeoutError,
+                        TimeoutError, ConnectionError)
+
+
+def _log_fallback(name, e):
+    if isinstance(e, TRANSIENT_EXCEPTIONS):
+        logger.warning("[Fallback] %s failed: %s: %s", name, type(e).__name__, e)
+    else:
+        logger.exception("[Fallback] %s failed", name)
+
+
+def async_fallback(fallback_value=None, handler=None, fallback_exceptions=(Exception,)):
     """
     Fallback returns safe value or calls handler on exception.
+    Only fallback_exceptions are caught; a coroutine handler is awaited.
     """
     def decorator(func):
+        fname = getattr(func, "__qualname__", func.__name__)
+        handler_is_async = asyncio.iscoroutinefunction(handler)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             try:
                 return await func(*args, **kwargs)
-            except Exception as e:
-                logger.exception(f"[Fallback] {func.__name__} failed")
+            except fallback_exceptions as e:
+                _log_fallback(fname, e)
+                if handler_is_async:
+                    return await handler(e, *args, **kwargs)
                 if handler:
                     return handler(e, *args, **kwargs)
                 return fallback_value
@@ -83,35 +304,109 @@ def resilient(
     """
     Polly-style combined decorator: Retry -> CircuitBreaker -> Fallback.
     Decorator order changed so fallback can handle breaker open errors.
+    Breaker and fallback share one wrapper, so a call adds a single frame
+    on top of the retry loop.
     """
     def decorator(func):
-        decorated = async_retry(
-            attempts=retry_attempts,
-            wait_min=retry_wait_min,
-            wait_max=retry_wait_max,
-            exceptions=retry_exceptions
-        )(func)
-        decorated = async_circuit_breaker(breaker)(decorated)
-        decorated = async_fallback(fallback_value, fallback_handler)(decorated)
-        return decorated
+        fname = getattr(func, "__qualname__", func.__name__)
+        bname = breaker.name
+        # The inner retry loop stays unwrapped; metadata is copied once, onto wrapper
+        retried = _retrying(func, retry_attempts, retry_wait_min,
+                            retry_wait_max, retry_exceptions, fname)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await _breaker_call(breaker, retried, *args, **kwargs)
+            except Exception as e:
+                if isinstance(e, pybreaker.CircuitBreakerError):
+                    logger.warning("[CircuitBreaker] %s OPEN — blocking call to %s",
+                                   bname, fname)
+                _log_fallback(fname, e)
+                if fallback_handler:
+                    return fallback_handler(e, *args, **kwargs)
+                return fallback_value
+        return wrapper
     return decorator
 
 
 # Optional helpers
+# Only short values (IDs, names) are memoized; transcripts are never cached
+SANITIZE_CACHE_MAX_LEN = 256
+
+
+def _sanitize(value: str) -> str:
+    return value.strip().replace('<', '').replace('>', '')
+
+
+_sanitize_cached = functools.lru_cache(maxsize=4096)(_sanitize)
+
+
 def sanitize_input(value: str) -> str:
     """Basic input sanitization to avoid unsafe characters."""
-    return value.strip().replace('<', '').replace('>', '')
+    if isinstance(value, str) and len(value) < SANITIZE_CACHE_MAX_LEN:
+        return _sanitize_cached(value)
+    return _sanitize(value)
+
+
+def string_fields(model) -> frozenset:
+    """Names of a Pydantic model's str / Optional[str] fields."""
+    return frozenset(
+        name for name, field in model.model_fields.items()
+        if field.annotation in (str, Optional[str])
+    )
+
+
+def sanitize_fields(data: dict, fields) -> dict:
+    """Sanitize the given string fields of a dumped model in place."""
+    for key in fields:
+        value = data.get(key)
+        if value is not None:
+            data[key] = sanitize_input(value)
+    return data
+
+
+# Log fields carrying PHI/PII; their values are redacted by key, whatever the message says
+SENSITIVE_KEYS = frozenset({
+    'patient_id', 'patient_name', 'owner_name', 'transcript', 'notes',
+    'phone', 'email', 'address', 'mrn', 'ssn', 'phi', 'pii',
+})
+REDACTED = '[REDACTED]'
+
+
+def _redact(mapping: dict) -> dict:
+    return {key: REDACTED if key in SENSITIVE_KEYS else value for key, value in mapping.items()}
 
 
 class SafeLogger(logging.Logger):
-    """Logger that redacts PHI/PII in info and error logs."""
+    """
+    Logger that redacts PHI/PII structurally: values passed under a sensitive
+    key, via extra={...} or a single mapping argument ("%(patient_id)s"),
+    are replaced before the record is formatted. Messages are never scanned.
+    """
+
+    def makeRecord(self, name, level, fn, lno, msg, args, exc_info,
+                   func=None, extra=None, sinfo=None):
+        if extra:
+            extra = _redact(extra)
+        if args and len(args) == 1 and isinstance(args[0], dict):
+            args = (_redact(args[0]),)
+        return super().makeRecord(name, level, fn, lno, msg, args, exc_info,
+                                  func=func, extra=extra, sinfo=sinfo)
 
-    def info(self, msg, *args, **kwargs):
-        if 'PHI' in msg or 'PII' in msg:
-            msg = '[REDACTED]'
-        super().info(msg, *args, **kwargs)
 
-    def error(self, msg, *args, **kwargs):
-        if 'PHI' in msg or 'PII' in msg:
-            msg = '[REDACTED]'
-        super().error(msg, *args, **kwargs)
+def get_safe_logger(name: str) -> SafeLogger:
+    """
+    SafeLogger registered in the logging hierarchy like logging.getLogger(name),
+    so it propagates to the root handlers and follows the configured level.
+    """
+    manager = logging.Logger.manager
+    previous = manager.loggerClass
+    manager.setLoggerClass(SafeLogger)
+    try:
+        logger = logging.getLogger(name)
+    finally:
+        manager.loggerClass = previous
+    if not isinstance(logger, SafeLogger):
+        raise TypeError(f"Logger {name!r} already exists as {type(logger).__name__}")
+    return logger
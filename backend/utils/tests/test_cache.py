@@ -0,0 +1,113 @@
+# test_cache.py
+
+import unittest
+from unittest import mock
+
+import pybreaker
+
+from backend.utils import cache
+from backend.utils.cache import cached
+from backend.utils.resiliency import resilient
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self.redis, self.ops = redis, []
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args: self.ops.append((command, args))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return [await command(*args) for command, args in self.ops]
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client."""
+
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, expire, value):
+        self.store[key] = value
+
+    async def sadd(self, key, member):
+        self.store.setdefault(key, set()).add(member)
+
+    async def smembers(self, key):
+        return set(self.store.get(key, ()))
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, *args, **kwargs):
+        raise AssertionError("invalidate() must not scan the keyspace")
+
+
+class ResilientCachedKeyTest(unittest.IsolatedAsyncioTestCase):
+    """@resilient over @cached must keep query params in the cache key."""
+
+    async def asyncSetUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(cache, "redis_client", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        breaker = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=60, name="test_cache")
+
+        @resilient(breaker=breaker, retry_attempts=1)
+        @cached(namespace="x", expire=30)
+        async def list_x(limit: int = 20, cursor=None, db=None):
+            return {"limit": limit, "cursor": cursor}
+
+        self.list_x = list_x
+
+    async def test_pages_get_distinct_keys(self):
+        # FastAPI calls endpoints with keyword arguments only
+        first = await self.list_x(limit=2, cursor=None, db=object())
+        second = await self.list_x(limit=2, cursor=2, db=object())
+
+        self.assertEqual(
+            self.redis.store["cache-index:x"],
+            {"cache:x:list_x:cursor=2,limit=2", "cache:x:list_x:cursor=None,limit=2"})
+        self.assertNotEqual(first.body, second.body)
+
+    async def test_cached_page_is_served(self):
+        await self.list_x(limit=2, cursor=2, db=object())
+        self.redis.store["cache:x:list_x:cursor=2,limit=2"] = b'{"hit":true}'
+
+        response = await self.list_x(limit=2, cursor=2, db=object())
+
+        self.assertEqual(response.body, b'{"hit":true}')
+
+
+    async def test_invalidate_drops_only_its_namespace(self):
+        await self.list_x(limit=2, cursor=None, db=object())
+        self.redis.store["cache:y:list_y:"] = b"{}"
+        self.redis.store["celery-task-meta-1"] = b"{}"
+
+        await cache.invalidate("x")
+
+        self.assertEqual(sorted(self.redis.store), ["cache:y:list_y:", "celery-task-meta-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
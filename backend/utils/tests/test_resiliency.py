@@ -0,0 +1,206 @@
+# test_resiliency.py
+
+import asyncio
+import logging
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pybreaker
+
+from backend.utils import resiliency
+from backend.utils.resiliency import SafeLogger, async_retry, get_safe_logger
+
+
+class RetryJitterTest(unittest.IsolatedAsyncioTestCase):
+    """Retry waits use full jitter: uniform(0, cap) with an exponential cap."""
+
+    async def test_waits_are_drawn_from_zero_to_cap(self):
+        calls = []
+
+        @async_retry(attempts=4, wait_min=1, wait_max=3, exceptions=(ValueError,))
+        async def flaky():
+            calls.append(1)
+            raise ValueError()
+
+        with mock.patch.object(resiliency.random, "uniform", return_value=0.5) as uniform, \
+                mock.patch.object(resiliency.asyncio, "sleep", new=mock.AsyncMock()) as sleep:
+            with self.assertRaises(ValueError):
+                await flaky()
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual([c.args for c in uniform.call_args_list], [(0, 1), (0, 2), (0, 3)])
+        self.assertEqual([c.args for c in sleep.call_args_list], [(0.5,)] * 3)
+
+
+class BreakerCallTest(unittest.IsolatedAsyncioTestCase):
+    """
+    _breaker_call relies on pybreaker internals (_listeners, state._handle_error,
+    _state_storage); walk a breaker through its whole cycle to catch renames.
+    """
+
+    async def test_open_half_open_close(self):
+        breaker = pybreaker.CircuitBreaker(fail_max=2, reset_timeout=60, success_threshold=2)
+        listener = mock.Mock(spec=pybreaker.CircuitBreakerListener)
+        breaker.add_listener(listener)
+
+        async def ok():
+            return "ok"
+
+        async def fail():
+            raise ValueError()
+
+        self.assertEqual(await resiliency._breaker_call(breaker, ok), "ok")
+        listener.success.assert_called_once()
+
+        with self.assertRaises(ValueError):
+            await resiliency._breaker_call(breaker, fail)
+        self.assertEqual(breaker.fail_counter, 1)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            await resiliency._breaker_call(breaker, fail)
+        self.assertEqual(breaker.current_state, pybreaker.STATE_OPEN)
+        self.assertEqual(listener.failure.call_count, 2)
+
+        # Still open until reset_timeout elapses; the call is not made
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            await resiliency._breaker_call(breaker, ok)
+
+        breaker._state_storage.opened_at = datetime.now(timezone.utc) - timedelta(seconds=61)
+        self.assertEqual(await resiliency._breaker_call(breaker, ok), "ok")
+        self.assertEqual(breaker.current_state, pybreaker.STATE_HALF_OPEN)
+        self.assertEqual(await resiliency._breaker_call(breaker, ok), "ok")
+        self.assertEqual(breaker.current_state, pybreaker.STATE_CLOSED)
+        self.assertEqual(breaker.fail_counter, 0)
+
+    async def test_cancellation_is_not_a_failure(self):
+        breaker = pybreaker.CircuitBreaker(fail_max=1, reset_timeout=60)
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await resiliency._breaker_call(breaker, cancelled)
+        self.assertEqual(breaker.fail_counter, 0)
+        self.assertEqual(breaker.current_state, pybreaker.STATE_CLOSED)
+
+
+class FakePipeline:
+    """Just enough of redis.asyncio's pipeline for SharedCircuitStorage.sync."""
+
+    def __init__(self, store):
+        self.store, self.ops = store, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        self.ops.append(lambda: self.store.__setitem__(key, str(value).encode()))
+
+    def incrby(self, key, amount):
+        self.ops.append(lambda: self.store.__setitem__(
+            key, str(int(self.store.get(key, 0)) + amount).encode()))
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+
+    def mget(self, *keys):
+        self.ops.append(lambda: [self.store.get(key) for key in keys])
+
+    async def execute(self):
+        return [op() for op in self.ops]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.store)
+
+
+class SharedCircuitStorageTest(unittest.IsolatedAsyncioTestCase):
+    """Breakers in different processes share state through Redis via sync()."""
+
+    async def test_open_circuit_propagates(self):
+        redis = FakeRedis()
+        a, b = (pybreaker.CircuitBreaker(fail_max=2, reset_timeout=60, name="svc",
+                                         state_storage=resiliency.SharedCircuitStorage("svc"))
+                for _ in range(2))
+
+        async def fail():
+            raise ValueError()
+
+        # One failure per process: only the shared counter reaches fail_max
+        for breaker in (a, b):
+            with self.assertRaises(ValueError):
+                await resiliency._breaker_call(breaker, fail)
+            await breaker._state_storage.sync(redis)
+        await a._state_storage.sync(redis)
+        self.assertEqual(a.fail_counter, 2)
+
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            await resiliency._breaker_call(a, fail)
+        self.assertEqual(b.current_state, pybreaker.STATE_CLOSED)
+
+        await a._state_storage.sync(redis)
+        await b._state_storage.sync(redis)
+        self.assertEqual(b.current_state, pybreaker.STATE_OPEN)
+        self.assertIsNotNone(b._state_storage.opened_at)
+
+    async def test_failed_sync_keeps_local_changes(self):
+        storage = resiliency.SharedCircuitStorage("svc")
+        storage.increment_counter()
+        broken = mock.Mock()
+        broken.pipeline.side_effect = ConnectionError("redis down")
+
+        with self.assertRaises(ConnectionError):
+            await storage.sync(broken)
+        redis = FakeRedis()
+        await storage.sync(redis)
+
+        self.assertEqual(redis.store["svc:pybreaker:fail_counter"], b"1")
+        self.assertEqual(storage.counter, 1)
+
+
+class SafeLoggerTest(unittest.TestCase):
+    """Safe loggers join the hierarchy and redact sensitive keys."""
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved = self.root.level, self.root.handlers[:]
+        self.records = []
+        handler = logging.Handler()
+        handler.emit = self.records.append
+        self.root.handlers = [handler]
+
+    def tearDown(self):
+        self.root.level, self.root.handlers = self.saved
+
+    def test_propagates_to_root_and_follows_its_level(self):
+        logger = get_safe_logger("backend.tests.safe_logger")
+        self.assertIsInstance(logger, SafeLogger)
+        self.assertIs(logging.getLogger("backend.tests.safe_logger"), logger)
+        self.assertIsNotNone(logger.parent)
+        self.assertIs(type(logging.getLogger("backend.tests.other")), logging.Logger)
+
+        self.root.setLevel(logging.WARNING)
+        logger.info("dropped")
+        logger.warning("kept")
+        self.assertEqual([r.getMessage() for r in self.records], ["kept"])
+
+    def test_redacts_sensitive_keys(self):
+        logger = get_safe_logger("backend.tests.redaction")
+        self.root.setLevel(logging.INFO)
+        logger.info("patient %(patient_id)s clinic %(clinic_id)s",
+                    {"patient_id": "p-1", "clinic_id": "c-1"}, extra={"owner_name": "Ann"})
+        record = self.records[0]
+        self.assertEqual(record.getMessage(), "patient [REDACTED] clinic c-1")
+        self.assertEqual(record.owner_name, "[REDACTED]")
+
+
+if __name__ == "__main__":
+    unittest.main()
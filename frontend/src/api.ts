@@ -0,0 +1,20 @@
+import axios from "axios";
+
+export interface Page<T> {
+    items: T[];
+    next_cursor: string | number | null;
+}
+
+// Follows next_cursor on a keyset-paginated list endpoint and returns every item.
+export const fetchAllPages = async <T>(url: string, limit = 500): Promise<T[]> => {
+    const items: T[] = [];
+    let cursor: string | number | null = null;
+    do {
+        const res: { data: Page<T> } = await axios.get<Page<T>>(url, {
+            params: { limit, cursor: cursor ?? undefined },
+        });
+        items.push(...res.data.items);
+        cursor = res.data.next_cursor;
+    } while (cursor !== null);
+    return items;
+};
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { fetchAllPages } from "../api";
 import { AutoSizer, List, type ListRowProps } from "react-virtualized";
 import { EntityCard } from "../components/EntityCard";
 import { EntitySkeleton } from "../components/EntitySkeleton";
@@ -24,8 +25,7 @@ export const Patients = () => {
     const fetchPatients = async () => {
         setLoading(true);
         try {
-            const res = await axios.get("/api/patients");
-            setPatients(res.data);
+            setPatients(await fetchAllPages("/api/patients"));
         } finally {
             setLoading(false);
         }
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { fetchAllPages } from "../api";
 import { AutoSizer, List, type ListRowProps } from "react-virtualized";
 import { useTaskStore } from "../store";
 import { EntityDrawer } from "../components/EntityDrawer";
@@ -78,8 +79,7 @@ const Transcripts: React.FC = () => {
     const fetchData = async () => {
         setLoading(true);
         try {
-            const res = await axios.get("/api/transcripts");
-            setTranscripts(res.data);
+            setTranscripts(await fetchAllPages<Transcript>("/api/transcripts"));
         } catch (err) {
             console.error("Error fetching transcripts:", err);
         } finally {
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { fetchAllPages } from "../api";
 import { AutoSizer, List, type ListRowProps } from "react-virtualized";
 import { EntityCard } from "../components/EntityCard";
 import { EntitySkeleton } from "../components/EntitySkeleton";
@@ -24,8 +25,7 @@ export const Veterinarians = () => {
     const fetchVeterinarians = async () => {
         setLoading(true);
         try {
-            const res = await axios.get("/api/veterinarians");
-            setVets(res.data);
+            setVets(await fetchAllPages("/api/veterinarians"));
         } finally {
             setLoading(false);
         }